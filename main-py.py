@@ -7,15 +7,23 @@ and test script generation.
 
 import os
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from src.element_extractor import ElementExtractor
 from src.test_case_generator import TestCaseGenerator
 from src.test_script_generator import TestScriptGenerator
-from src.utils import setup_directories, validate_url
+from src.utils import setup_directories, parse_urls, validate_url
+
+# Concurrent extractions when SE_NODE_MAX_SESSIONS is not set
+DEFAULT_MAX_SESSIONS = 4
 
 def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description='AI-Driven Test Automation Prototype')
-    parser.add_argument('--url', type=str, help='Target website URL')
+    parser.add_argument(
+        '--url', 
+        type=str, 
+        help='Target website URL, a comma-separated list of URLs, or a file with one URL per line'
+    )
     parser.add_argument(
         '--task', 
         type=str, 
@@ -49,6 +57,7 @@ def main():
     # Define file paths
     elements_json_path = os.path.join(args.output, 'elements.json')
     test_cases_path = os.path.join(args.output, 'test_cases.xlsx')
+    test_cases_jsonl_path = os.path.join(args.output, 'test_cases.jsonl')
     test_scripts_path = os.path.join(args.output, 'test_scripts.xlsx')
     
     # Execute tasks based on user selection
@@ -56,13 +65,40 @@ def main():
         if not args.url:
             raise ValueError("URL is required for extraction task. Use --url parameter.")
         
-        print(f"Task 1: Extracting elements from {args.url}")
-        if not validate_url(args.url):
-            raise ValueError(f"Invalid URL: {args.url}")
-            
-        extractor = ElementExtractor(args.url)
-        elements = extractor.extract_elements()
-        extractor.save_elements(elements, elements_json_path)
+        urls = parse_urls(args.url)
+        if not urls:
+            raise ValueError(f"No URLs found in: {args.url}")
+        for url in urls:
+            if not validate_url(url):
+                raise ValueError(f"Invalid URL: {url}")
+        if len(urls) > 1 and args.task == 'all':
+            raise ValueError("Test generation works on a single page. Use --task extract for multiple URLs.")
+        
+        print(f"Task 1: Extracting elements from {', '.join(urls)}")
+        extractors = [ElementExtractor(url) for url in urls]
+        try:
+            if len(extractors) == 1:
+                elements = extractors[0].extract_elements()
+            else:
+                # Extraction mostly waits on the browser, so run one session per worker
+                max_workers = min(len(urls), int(os.environ.get('SE_NODE_MAX_SESSIONS', DEFAULT_MAX_SESSIONS)))
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    futures = {url: pool.submit(extractor.extract_elements)
+                               for url, extractor in zip(urls, extractors)}
+                    elements = {}
+                    for url, future in futures.items():
+                        # One unreachable page shouldn't lose the others
+                        try:
+                            elements[url] = future.result()
+                        except Exception as e:
+                            print(f"Skipping {url}: extraction failed: {e}")
+                if not elements:
+                    raise RuntimeError("Element extraction failed for every URL")
+        finally:
+            # Don't keep the browsers open through the manual steps of tasks 2 and 3
+            ElementExtractor.quit_drivers()
+        
+        extractors[0].save_elements(elements, elements_json_path)
         print(f"Elements saved to {elements_json_path}")
     
     if args.task in ['generate_tests', 'all']:
@@ -73,14 +109,19 @@ def main():
         test_generator = TestCaseGenerator(elements_json_path)
         test_generator.generate_test_cases()
         test_generator.save_test_cases(test_cases_path)
+        test_generator.save_test_cases_jsonl(test_cases_jsonl_path)
         print(f"Test cases saved to {test_cases_path}")
     
     if args.task in ['generate_scripts', 'all']:
         print("Task 3: Generating Selenium scripts using AI")
         if not os.path.exists(test_cases_path):
             raise FileNotFoundError(f"Test cases file not found: {test_cases_path}. Run test case generation task first.")
-            
-        script_generator = TestScriptGenerator(test_cases_path)
+        
+        # Read the JSONL copy unless the Excel file was edited after it was written
+        if os.path.exists(test_cases_jsonl_path) and os.path.getmtime(test_cases_jsonl_path) >= os.path.getmtime(test_cases_path):
+            script_generator = TestScriptGenerator(test_cases_jsonl_path)
+        else:
+            script_generator = TestScriptGenerator(test_cases_path)
         script_generator.generate_scripts()
         script_generator.save_scripts(test_scripts_path)
         print(f"Test scripts saved to {test_scripts_path}")
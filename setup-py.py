@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Optional build script that compiles the element extractor to a C extension with mypyc.
+
+Usage:
+    pip install mypy
+    python setup.py build_ext --inplace
+
+The compiled module is imported in place of src/element_extractor.py, which stays
+in the tree for development. Delete the generated .so files to go back to it.
+"""
+
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name='ai-test-automation',
+    ext_modules=mypycify([
+        '--ignore-missing-imports',
+        'src/element_extractor.py',
+    ]),
+)
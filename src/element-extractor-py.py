@@ -4,318 +4,727 @@ Element Extractor module for web scraping and UI element extraction.
 This module handles Task 1 of the project: extracting UI elements from a website.
 """
 
-import json
-import time
+import atexit
+import codecs
+import io
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, ClassVar, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import orjson
+import requests
+from lxml import etree
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+# Input types reported as buttons rather than input fields
+BUTTON_INPUT_TYPES = ('button', 'submit', 'reset')
+
+# Button and input types reported as form submission elements
+FORM_SUBMIT_TYPES = ('submit', 'button')
+
+HEADER_TAGS = ('h1', 'h2', 'h3')
+
+# Tags with a dedicated branch in the extraction pass; any other tag can only
+# be picked up by its button-like class name
+EXTRACTED_TAGS = frozenset((
+    'button', 'input', 'a', 'textarea', 'select', 'option', 'form', 'h1', 'h2', 'h3',
+    'div', 'section', 'nav', 'ul', 'title', 'script'
+))
+
+# Attributes reported in their own fields, and so left out of 'attributes'
+BUTTON_SKIP_ATTRS = frozenset(('id', 'class', 'name', 'type'))
+INPUT_BUTTON_SKIP_ATTRS = frozenset(('id', 'class', 'name', 'type', 'value'))
+INPUT_SKIP_ATTRS = frozenset(('type', 'id', 'name', 'placeholder', 'value', 'required', 'class'))
+LINK_SKIP_ATTRS = frozenset(('href', 'id', 'class', 'name', 'title', 'target'))
+TEXTAREA_SKIP_ATTRS = frozenset(('id', 'name', 'placeholder', 'required', 'class', 'rows', 'cols'))
+SELECT_SKIP_ATTRS = frozenset(('id', 'name', 'required', 'class', 'multiple'))
+FORM_SKIP_ATTRS = frozenset(('id', 'name', 'action', 'method', 'class'))
+CLASS_BUTTON_SKIP_ATTRS = frozenset(('id', 'class'))
+
+# A fetched page is treated as static, and extracted without a browser, when it
+# loads at most this many external scripts and has at least this many buttons,
+# links and inputs
+STATIC_MAX_EXTERNAL_SCRIPTS = 10
+STATIC_MIN_INTERACTIVE_ELEMENTS = 10
+
+STATIC_USER_AGENT = ('Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+                     '(KHTML, like Gecko) Chrome/116.0 Safari/537.36')
+
+# Room for every resource a long-polling page fetches before the network wait times out
+RESOURCE_TIMING_BUFFER_SIZE = 100000
+
+# Number of finished resources and when the latest one finished; the network
+# counts as idle once this stops changing
+RESOURCE_STATE_SCRIPT = """
+const entries = performance.getEntriesByType('resource');
+let latest = 0;
+for (const entry of entries) {
+    latest = Math.max(latest, entry.responseEnd);
+}
+return [entries.length, latest];
+"""
+
+# Browsers started for extraction, one per thread, created on first use
+_thread_drivers = threading.local()
+_all_drivers: List[Any] = []
+_all_drivers_lock = threading.Lock()
+# Bumped whenever the browsers are quit, so each thread knows to start a new one
+_driver_generation = 0
+
+def _quit_shared_drivers() -> None:
+    """Quit every browser started for extraction."""
+    global _driver_generation
+    with _all_drivers_lock:
+        _driver_generation += 1
+        while _all_drivers:
+            driver = _all_drivers.pop()
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error closing browser: {str(e)}")
+
+def _discard_thread_driver(driver: Any) -> None:
+    """Forget the calling thread's browser after it failed, and quit it best-effort."""
+    with _all_drivers_lock:
+        if driver in _all_drivers:
+            _all_drivers.remove(driver)
+    if getattr(_thread_drivers, 'driver', None) is driver:
+        _thread_drivers.driver = None
+        _thread_drivers.generation = None
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+# Safety net for runs that exit without calling ElementExtractor.quit_drivers()
+atexit.register(_quit_shared_drivers)
+
+@lru_cache(maxsize=1)
+def _driver_path() -> str:
+    """
+    Return the ChromeDriver executable path, resolving it once per process.
+    
+    CHROMEDRIVER_PATH, when set, is used as-is; otherwise webdriver-manager
+    looks up and installs a driver matching the local Chrome.
+    """
+    return os.environ.get('CHROMEDRIVER_PATH') or ChromeDriverManager().install()
+
+# Attribute values such as types, targets and short class names repeat across
+# thousands of records, so those are interned to share one string object each
+_intern = sys.intern
+
+# Longer class strings are rarely repeated and not worth interning
+MAX_INTERNED_CLASS_LENGTH = 64
+
+def _class_string(css_class: Optional[str]) -> str:
+    """Return the tokens of a class attribute joined by single spaces."""
+    if not css_class:
+        return ''
+    joined = ' '.join(css_class.split())
+    return _intern(joined) if len(joined) < MAX_INTERNED_CLASS_LENGTH else joined
+
+# Elements whose content is code or inert markup rather than page text
+NON_TEXT_TAGS = frozenset(('script', 'style', 'template'))
+
+def _visible_strings(elem: Any) -> Iterator[str]:
+    """
+    Yield the text strings of an element's subtree in document order.
+    
+    The content of script, style and template descendants, and of comments, is
+    skipped, but the text following them is kept.
+    """
+    if elem.text:
+        yield elem.text
+    for child in elem:
+        # Comments and processing instructions have a factory function as their tag
+        if isinstance(child.tag, str) and child.tag not in NON_TEXT_TAGS:
+            yield from _visible_strings(child)
+        if child.tail:
+            yield child.tail
+
+def _text(elem: Any) -> str:
+    """
+    Return the stripped text content of an element and its descendants.
+    
+    Whitespace-only strings collapse to a single newline or space, and script,
+    style and template descendants are left out, the same way BeautifulSoup
+    builds an element's text.
+    """
+    # Most links, buttons, options and headers hold a single string, which
+    # stripping alone normalises; with no children there is nothing to skip
+    if not len(elem):
+        return (elem.text or '').strip()
+    
+    return ''.join(
+        ('\n' if '\n' in string else ' ') if string.isspace() else string
+        for string in _visible_strings(elem)
+    ).strip()
 
 class ElementExtractor:
     """Class responsible for extracting UI elements from a website."""
     
-    def __init__(self, url):
+    def __init__(self, url: str, timeout: float = 10, try_static: bool = True) -> None:
         """
         Initialize the ElementExtractor.
         
         Args:
             url (str): The URL of the website to scrape.
+            timeout (float): Maximum seconds to wait for each page load condition.
+            try_static (bool): Try a plain HTTP fetch before launching a browser.
         """
         self.url = url
+        self.timeout = timeout
+        self.try_static = try_static
         
-    def setup_driver(self):
+    @classmethod
+    def setup_driver(cls) -> Any:
         """Set up and return a Selenium WebDriver instance."""
         chrome_options = Options()
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         
-        service = Service(ChromeDriverManager().install())
+        # Only the rendered DOM is needed, so skip downloading images, stylesheets and fonts
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.stylesheets": 2,
+            "profile.managed_default_content_settings.fonts": 2
+        })
+        
+        # Return from driver.get at DOMContentLoaded; extract_elements waits for the rest
+        chrome_options.page_load_strategy = 'eager'
+        
+        # Run on a Selenium Grid instead of a local browser when one is configured
+        remote_url = os.environ.get('SELENIUM_REMOTE_URL')
+        if remote_url:
+            return webdriver.Remote(command_executor=remote_url, options=chrome_options)
+        
+        service = Service(_driver_path())
         driver = webdriver.Chrome(service=service, options=chrome_options)
         return driver
     
-    def extract_elements(self):
+    @classmethod
+    def get_shared_driver(cls) -> Any:
+        """
+        Return the calling thread's browser, starting it on first use.
+        
+        Each thread reuses its own browser across extractions, so extractions
+        can run concurrently. All browsers are quit by quit_drivers(), or when
+        the interpreter exits.
+        
+        Returns:
+            WebDriver: The thread's Selenium WebDriver instance.
+        """
+        if getattr(_thread_drivers, 'generation', None) != _driver_generation:
+            driver = cls.setup_driver()
+            with _all_drivers_lock:
+                _all_drivers.append(driver)
+                _thread_drivers.generation = _driver_generation
+            _thread_drivers.driver = driver
+        return _thread_drivers.driver
+    
+    @classmethod
+    def quit_drivers(cls) -> None:
+        """
+        Quit every browser started for extraction, in all threads.
+        
+        Call this once extraction is finished so the browsers, or Grid sessions,
+        are not held open; a later extraction starts new ones.
+        """
+        _quit_shared_drivers()
+    
+    @classmethod
+    @contextmanager
+    def with_page(cls, url: str) -> Iterator[Any]:
+        """
+        Navigate the calling thread's browser to a URL for the duration of the block.
+        
+        Args:
+            url (str): The URL to open.
+            
+        Yields:
+            WebDriver: The thread's driver, showing the requested page.
+        """
+        driver = cls.get_shared_driver()
+        try:
+            print(f"Navigating to {url}")
+            driver.get(url)
+            yield driver
+        except TimeoutException:
+            # A slow page says nothing about the browser, which stays in use
+            raise
+        except WebDriverException:
+            # Crashed browser or expired session; the next extraction starts a new one
+            _discard_thread_driver(driver)
+            raise
+    
+    def extract_elements(self) -> Dict[str, Any]:
         """
         Extract UI elements from the target website.
         
         Returns:
             dict: A dictionary containing the extracted elements categorized by type.
         """
-        driver = self.setup_driver()
-        try:
-            print(f"Navigating to {self.url}")
-            driver.get(self.url)
-            
+        # Server-rendered pages look the same without a browser, so try those first
+        fetched = self._try_static_fetch(self.url) if self.try_static else None
+        if fetched:
+            final_url, content, encoding = fetched
+            try:
+                elements, page_structure, page_info = self._stream_elements(content, encoding)
+            except (etree.LxmlError, LookupError, ValueError):
+                # The probe is optional; anything it cannot parse or decode goes to the browser
+                elements = None
+            if elements is not None and self._is_static_page(elements, page_info):
+                print(f"Extracted {self.url} without a browser (static page)")
+                elements['metadata'] = {
+                    'title': page_info.get('title', ''),
+                    'url': final_url,
+                    'page_structure': page_structure
+                }
+                return elements
+        
+        with self.with_page(self.url) as driver:
             # Wait for page to load
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(('tag name', 'body'))
-            )
+            wait = WebDriverWait(driver, self.timeout)
+            wait.until(EC.presence_of_element_located(('tag name', 'body')))
             
-            # Allow time for dynamic content to load
-            time.sleep(3)
+            # Wait for dynamic content to finish loading; pages that never settle
+            # are still extracted once the timeout passes
+            self._wait_if_possible(
+                wait, lambda d: d.execute_script("return document.readyState") == "complete",
+                "Page still loading")
+            self._wait_if_possible(
+                wait, lambda d: d.execute_script("return (typeof jQuery === 'undefined') || jQuery.active === 0"),
+                "jQuery requests still active")
+            self._wait_for_network_idle(driver)
             
-            # Get page source and parse with BeautifulSoup
-            html = driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Extract elements by type
-            elements = {
-                'buttons': self._extract_buttons(soup),
-                'links': self._extract_links(soup),
-                'inputs': self._extract_inputs(soup),
-                'forms': self._extract_forms(soup, driver)
-            }
+            # Extract elements by type in a single pass over the page source
+            elements, page_structure, _ = self._stream_elements(driver.page_source)
             
             # Add page metadata
             elements['metadata'] = {
                 'title': driver.title,
                 'url': driver.current_url,
-                'page_structure': self._get_page_structure(soup)
+                'page_structure': page_structure
             }
             
             return elements
+    
+    def _try_static_fetch(self, url: str) -> Optional[Tuple[str, bytes, Optional[str]]]:
+        """
+        Fetch the page over plain HTTP, without running any JavaScript.
+        
+        Args:
+            url (str): The URL to fetch.
             
-        finally:
-            driver.quit()
+        Returns:
+            tuple: The final URL after redirects, the raw page bytes and the charset
+                to decode them with (None to let the parser read the page's
+                <meta charset>), or None if the page could not be fetched as HTML.
+        """
+        try:
+            resp = requests.get(url, timeout=5, headers={'User-Agent': STATIC_USER_AGENT})
+            resp.raise_for_status()
+        except requests.RequestException:
+            return None
+        
+        content_type = resp.headers.get('Content-Type', '')
+        content = resp.content
+        if 'html' not in content_type or not content.strip():
+            return None
+        
+        # requests falls back to ISO-8859-1 for text/html without a charset, so
+        # its guess is only used when the server actually sent one
+        encoding = resp.encoding if 'charset=' in content_type.lower() else None
+        
+        # Bogus charsets such as "utf8mb4" or "none" are ignored in favour of the page's own
+        if encoding is not None:
+            try:
+                encoding = codecs.lookup(encoding).name
+            except LookupError:
+                encoding = None
+        
+        # A page declaring no charset at all is read as UTF-8 when it decodes as such;
+        # otherwise the parser falls back to its own default
+        if encoding is None and b'charset' not in content[:1024].lower():
+            try:
+                content.decode('utf-8')
+                encoding = 'utf-8'
+            except UnicodeDecodeError:
+                pass
+        return resp.url, content, encoding
     
-    def _extract_buttons(self, soup):
-        """Extract button elements from the page."""
-        buttons = []
-        
-        # Find all button tags
-        button_tags = soup.find_all('button')
-        for button in button_tags:
-            button_info = {
-                'element_type': 'button',
-                'text': button.text.strip(),
-                'id': button.get('id', ''),
-                'class': ' '.join(button.get('class', [])),
-                'name': button.get('name', ''),
-                'disabled': button.has_attr('disabled'),
-                'type': button.get('type', ''),
-                'attributes': {k: v for k, v in button.attrs.items() if k not in ['id', 'class', 'name', 'type']}
-            }
-            buttons.append(button_info)
-        
-        # Find input elements of type button or submit
-        input_buttons = soup.find_all('input', type=['button', 'submit', 'reset'])
-        for button in input_buttons:
-            button_info = {
-                'element_type': 'input_button',
-                'text': button.get('value', ''),
-                'id': button.get('id', ''),
-                'class': ' '.join(button.get('class', [])),
-                'name': button.get('name', ''),
-                'disabled': button.has_attr('disabled'),
-                'type': button.get('type', ''),
-                'attributes': {k: v for k, v in button.attrs.items() if k not in ['id', 'class', 'name', 'type', 'value']}
-            }
-            buttons.append(button_info)
+    def _is_static_page(self, elements: Dict[str, Any], page_info: Dict[str, Any]) -> bool:
+        """
+        Decide whether a page fetched without a browser can be extracted as-is.
+        
+        Pages that pull in many external scripts, or have hardly any interactive
+        elements before JavaScript runs, are most likely rendered client-side.
+        
+        Args:
+            elements (dict): Elements extracted from the fetched HTML.
+            page_info (dict): Page details gathered during extraction.
             
-        # Find elements with button-like class names
-        button_classes = soup.find_all(class_=lambda c: c and ('btn' in c.lower() or 'button' in c.lower()))
-        for element in button_classes:
-            if element.name not in ['button', 'input']:  # Avoid duplicates
-                button_info = {
-                    'element_type': 'button_class',
-                    'text': element.text.strip(),
-                    'html_tag': element.name,
-                    'id': element.get('id', ''),
-                    'class': ' '.join(element.get('class', [])),
-                    'attributes': {k: v for k, v in element.attrs.items() if k not in ['id', 'class']}
-                }
-                buttons.append(button_info)
+        Returns:
+            bool: True if the fetched HTML can stand in for the rendered page.
+        """
+        interactive = len(elements['buttons']) + len(elements['links']) + len(elements['inputs'])
+        return (page_info['external_scripts'] <= STATIC_MAX_EXTERNAL_SCRIPTS
+                and interactive >= STATIC_MIN_INTERACTIVE_ELEMENTS)
+    
+    def _wait_if_possible(self, wait: Any, condition: Any, busy_message: str) -> None:
+        """
+        Wait for a page load condition, carrying on with the current page state on timeout.
         
-        return buttons
+        Args:
+            wait (WebDriverWait): The wait to run the condition with.
+            condition (callable): The condition to wait for, given the driver.
+            busy_message (str): What is still happening, reported on timeout.
+        """
+        try:
+            wait.until(condition)
+        except TimeoutException:
+            print(f"{busy_message} after {self.timeout}s, extracting current page state")
     
-    def _extract_links(self, soup):
-        """Extract link elements from the page."""
-        links = []
-        
-        # Find all anchor tags
-        anchor_tags = soup.find_all('a')
-        for link in anchor_tags:
-            link_info = {
-                'element_type': 'link',
-                'text': link.text.strip(),
-                'href': link.get('href', ''),
-                'id': link.get('id', ''),
-                'class': ' '.join(link.get('class', [])),
-                'name': link.get('name', ''),
-                'title': link.get('title', ''),
-                'target': link.get('target', ''),
-                'attributes': {k: v for k, v in link.attrs.items() 
-                              if k not in ['href', 'id', 'class', 'name', 'title', 'target']}
-            }
-            links.append(link_info)
+    def _wait_for_network_idle(self, driver: Any, window: float = 0.5) -> None:
+        """
+        Wait until the page has stopped fetching new resources.
+        
+        The page counts as idle once no resource has finished loading for a whole
+        window. Pages that keep polling are extracted as-is once the timeout passes.
         
-        return links
+        Args:
+            driver (WebDriver): The driver showing the page.
+            window (float): Seconds without finished resources that count as idle.
+        """
+        last_state: List[Any] = [None]
+        
+        def resources_settled(d: Any) -> bool:
+            state = d.execute_script(RESOURCE_STATE_SCRIPT)
+            settled = state == last_state[0]
+            last_state[0] = state
+            return settled
+        
+        # The resource timing buffer stops recording at 250 entries by default,
+        # which would make a busy page look idle
+        driver.execute_script("performance.setResourceTimingBufferSize(arguments[0])",
+                              RESOURCE_TIMING_BUFFER_SIZE)
+        try:
+            WebDriverWait(driver, self.timeout, poll_frequency=window).until(resources_settled)
+        except TimeoutException:
+            print(f"Network still busy after {self.timeout}s, extracting current page state")
     
-    def _extract_inputs(self, soup):
-        """Extract input fields from the page."""
-        inputs = []
-        
-        # Find all input tags (excluding button/submit types which are handled as buttons)
-        input_tags = soup.find_all('input', type=lambda t: t not in ['button', 'submit', 'reset'])
-        for input_field in input_tags:
-            input_info = {
-                'element_type': 'input',
-                'type': input_field.get('type', 'text'),
-                'id': input_field.get('id', ''),
-                'name': input_field.get('name', ''),
-                'placeholder': input_field.get('placeholder', ''),
-                'value': input_field.get('value', ''),
-                'required': input_field.has_attr('required'),
-                'class': ' '.join(input_field.get('class', [])),
-                'disabled': input_field.has_attr('disabled'),
-                'readonly': input_field.has_attr('readonly'),
-                'attributes': {k: v for k, v in input_field.attrs.items() 
-                              if k not in ['type', 'id', 'name', 'placeholder', 'value', 'required', 'class']}
-            }
-            inputs.append(input_info)
-        
-        # Find all textarea tags
-        textarea_tags = soup.find_all('textarea')
-        for textarea in textarea_tags:
-            textarea_info = {
-                'element_type': 'textarea',
-                'id': textarea.get('id', ''),
-                'name': textarea.get('name', ''),
-                'placeholder': textarea.get('placeholder', ''),
-                'value': textarea.text.strip(),
-                'required': textarea.has_attr('required'),
-                'class': ' '.join(textarea.get('class', [])),
-                'disabled': textarea.has_attr('disabled'),
-                'readonly': textarea.has_attr('readonly'),
-                'rows': textarea.get('rows', ''),
-                'cols': textarea.get('cols', ''),
-                'attributes': {k: v for k, v in textarea.attrs.items() 
-                              if k not in ['id', 'name', 'placeholder', 'required', 'class', 'rows', 'cols']}
-            }
-            inputs.append(textarea_info)
-        
-        # Find all select tags
-        select_tags = soup.find_all('select')
-        for select in select_tags:
-            options = []
-            for option in select.find_all('option'):
-                options.append({
-                    'value': option.get('value', ''),
-                    'text': option.text.strip(),
-                    'selected': option.has_attr('selected')
-                })
+    def _stream_elements(self, html: Union[str, bytes],
+                         encoding: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """
+        Extract buttons, links, inputs, forms and page structure in one streaming parse.
+        
+        Records are created on each element's start event, in document order. Text
+        content is filled in on the end event, after which the element is cleared
+        unless an enclosing element still needs its text.
+        
+        All parsing state is local and the module-level lookup sets are immutable,
+        so pages can be extracted from several threads at once.
+        
+        Args:
+            html (str or bytes): The rendered page source, or the raw bytes of a
+                fetched page.
+            encoding (str): Charset of raw page bytes; when None, the parser
+                detects it from the page's <meta charset>. Ignored for str input.
             
-            select_info = {
-                'element_type': 'select',
-                'id': select.get('id', ''),
-                'name': select.get('name', ''),
-                'required': select.has_attr('required'),
-                'class': ' '.join(select.get('class', [])),
-                'disabled': select.has_attr('disabled'),
-                'multiple': select.has_attr('multiple'),
-                'options': options,
-                'attributes': {k: v for k, v in select.attrs.items() 
-                              if k not in ['id', 'name', 'required', 'class', 'multiple']}
-            }
-            inputs.append(select_info)
+        Returns:
+            tuple: The extracted elements dict, the page structure dict, and a dict
+                with the page title and its number of external scripts.
+        """
+        buttons: List[Dict[str, Any]] = []
+        input_buttons: List[Dict[str, Any]] = []
+        class_buttons: List[Dict[str, Any]] = []
+        links: List[Dict[str, Any]] = []
+        inputs: List[Dict[str, Any]] = []
+        textareas: List[Dict[str, Any]] = []
+        selects: List[Dict[str, Any]] = []
+        forms: List[Dict[str, Any]] = []
+        headers: Dict[str, List[Dict[str, Any]]] = {tag: [] for tag in HEADER_TAGS}
+        sections: List[Dict[str, Any]] = []
+        navigation: List[Dict[str, Any]] = []
+        page_info: Dict[str, Any] = {'external_scripts': 0}
         
-        return inputs
-    
-    def _extract_forms(self, soup, driver):
-        """Extract form elements from the page."""
-        forms = []
-        
-        # Find all form tags
-        form_tags = soup.find_all('form')
-        for form in form_tags:
-            # Extract form inputs
-            form_inputs = []
-            for input_field in form.find_all('input'):
-                input_info = {
-                    'type': input_field.get('type', 'text'),
-                    'id': input_field.get('id', ''),
-                    'name': input_field.get('name', ''),
-                    'placeholder': input_field.get('placeholder', ''),
-                    'value': input_field.get('value', ''),
-                    'required': input_field.has_attr('required')
-                }
-                form_inputs.append(input_info)
+        form_stack: List[Tuple[Any, Dict[str, Any]]] = []          # Forms currently open
+        select_stack: List[Tuple[Any, List[Dict[str, Any]]]] = []  # Option lists of the selects currently open
+        nav_stack: List[Tuple[Any, Dict[str, Any]]] = []           # Navigation menus currently open
+        pending: List[Tuple[Any, List[Tuple[Dict[str, Any], str]]]] = []  # Records awaiting an element's text
+        
+        # Bind the appends that run for most matching elements once, outside the loop
+        add_link = links.append
+        add_section = sections.append
+        add_class_button = class_buttons.append
+        add_pending = pending.append
+        
+        if isinstance(html, str):
+            html, encoding = html.encode('utf-8'), 'utf-8'
+        source = io.BytesIO(html)
+        for event, elem in etree.iterparse(source, events=('start', 'end'), html=True, encoding=encoding):
+            tag = elem.tag
             
-            # Extract form submission elements
-            submit_elements = []
-            for submit in form.find_all(['button', 'input'], type=['submit', 'button']):
-                submit_info = {
-                    'element_type': 'submit_button' if submit.get('type') == 'submit' else 'button',
-                    'text': submit.text.strip() if submit.name == 'button' else submit.get('value', ''),
-                    'id': submit.get('id', ''),
-                    'name': submit.get('name', '')
-                }
-                submit_elements.append(submit_info)
+            if event == 'end':
+                # Fill in the text of every record created for this element
+                if pending and pending[-1][0] is elem:
+                    text = _text(elem)
+                    for record, key in pending.pop()[1]:
+                        record[key] = text
+                
+                if form_stack and form_stack[-1][0] is elem:
+                    form_stack.pop()
+                elif select_stack and select_stack[-1][0] is elem:
+                    select_stack.pop()
+                if nav_stack and nav_stack[-1][0] is elem:
+                    nav_stack.pop()
+                
+                # Nothing open still needs this subtree, so release it
+                if not pending:
+                    elem.clear()
+                    # The root has no parent, even when comments come before it
+                    parent = elem.getparent()
+                    if parent is not None:
+                        while elem.getprevious() is not None:
+                            del parent[0]
+                continue
             
-            form_info = {
-                'element_type': 'form',
-                'id': form.get('id', ''),
-                'name': form.get('name', ''),
-                'action': form.get('action', ''),
-                'method': form.get('method', 'get'),
-                'class': ' '.join(form.get('class', [])),
-                'inputs': form_inputs,
-                'submission_elements': submit_elements,
-                'attributes': {k: v for k, v in form.attrs.items() 
-                              if k not in ['id', 'name', 'action', 'method', 'class']}
-            }
-            forms.append(form_info)
+            targets: List[Tuple[Dict[str, Any], str]] = []  # (record, key) pairs that receive this element's text
+            css_class: Optional[str] = elem.get('class')
+            lowered_class = css_class.lower() if css_class else ''
+            
+            if tag in EXTRACTED_TAGS:
+                if tag == 'button':
+                    button_type = _intern(elem.get('type', ''))
+                    button_info = {
+                        'element_type': 'button',
+                        'text': '',
+                        'id': elem.get('id', ''),
+                        'class': _class_string(css_class),
+                        'name': elem.get('name', ''),
+                        'disabled': 'disabled' in elem.attrib,
+                        'type': button_type,
+                        'attributes': {k: v for k, v in elem.attrib.items() if k not in BUTTON_SKIP_ATTRS}
+                    }
+                    buttons.append(button_info)
+                    targets.append((button_info, 'text'))
+                
+                    if button_type in FORM_SUBMIT_TYPES:
+                        for _, form_info in form_stack:
+                            submit_info = {
+                                'element_type': 'submit_button' if button_type == 'submit' else 'button',
+                                'text': '',
+                                'id': elem.get('id', ''),
+                                'name': elem.get('name', '')
+                            }
+                            form_info['submission_elements'].append(submit_info)
+                            targets.append((submit_info, 'text'))
+            
+                elif tag == 'input':
+                    input_type = elem.get('type')
+                    if input_type is not None:
+                        input_type = _intern(input_type)
+                    if input_type in BUTTON_INPUT_TYPES:
+                        input_buttons.append({
+                            'element_type': 'input_button',
+                            'text': elem.get('value', ''),
+                            'id': elem.get('id', ''),
+                            'class': _class_string(css_class),
+                            'name': elem.get('name', ''),
+                            'disabled': 'disabled' in elem.attrib,
+                            'type': input_type,
+                            'attributes': {k: v for k, v in elem.attrib.items() if k not in INPUT_BUTTON_SKIP_ATTRS}
+                        })
+                    else:
+                        inputs.append({
+                            'element_type': 'input',
+                            'type': 'text' if input_type is None else input_type,
+                            'id': elem.get('id', ''),
+                            'name': elem.get('name', ''),
+                            'placeholder': elem.get('placeholder', ''),
+                            'value': elem.get('value', ''),
+                            'required': 'required' in elem.attrib,
+                            'class': _class_string(css_class),
+                            'disabled': 'disabled' in elem.attrib,
+                            'readonly': 'readonly' in elem.attrib,
+                            'attributes': {k: v for k, v in elem.attrib.items() 
+                                          if k not in INPUT_SKIP_ATTRS}
+                        })
+                
+                    for _, form_info in form_stack:
+                        form_info['inputs'].append({
+                            'type': 'text' if input_type is None else input_type,
+                            'id': elem.get('id', ''),
+                            'name': elem.get('name', ''),
+                            'placeholder': elem.get('placeholder', ''),
+                            'value': elem.get('value', ''),
+                            'required': 'required' in elem.attrib
+                        })
+                        if input_type in FORM_SUBMIT_TYPES:
+                            form_info['submission_elements'].append({
+                                'element_type': 'submit_button' if input_type == 'submit' else 'button',
+                                'text': elem.get('value', ''),
+                                'id': elem.get('id', ''),
+                                'name': elem.get('name', '')
+                            })
+            
+                elif tag == 'a':
+                    link_info = {
+                        'element_type': 'link',
+                        'text': '',
+                        'href': elem.get('href', ''),
+                        'id': elem.get('id', ''),
+                        'class': _class_string(css_class),
+                        'name': elem.get('name', ''),
+                        'title': elem.get('title', ''),
+                        'target': _intern(elem.get('target', '')),
+                        'attributes': {k: v for k, v in elem.attrib.items() 
+                                      if k not in LINK_SKIP_ATTRS}
+                    }
+                    add_link(link_info)
+                    targets.append((link_info, 'text'))
+                
+                    for _, nav_info in nav_stack:
+                        nav_item = {'text': '', 'href': elem.get('href', '')}
+                        nav_info['items'].append(nav_item)
+                        targets.append((nav_item, 'text'))
+            
+                elif tag == 'textarea':
+                    textarea_info = {
+                        'element_type': 'textarea',
+                        'id': elem.get('id', ''),
+                        'name': elem.get('name', ''),
+                        'placeholder': elem.get('placeholder', ''),
+                        'value': '',
+                        'required': 'required' in elem.attrib,
+                        'class': _class_string(css_class),
+                        'disabled': 'disabled' in elem.attrib,
+                        'readonly': 'readonly' in elem.attrib,
+                        'rows': elem.get('rows', ''),
+                        'cols': elem.get('cols', ''),
+                        'attributes': {k: v for k, v in elem.attrib.items() 
+                                      if k not in TEXTAREA_SKIP_ATTRS}
+                    }
+                    textareas.append(textarea_info)
+                    targets.append((textarea_info, 'value'))
+            
+                elif tag == 'select':
+                    select_info = {
+                        'element_type': 'select',
+                        'id': elem.get('id', ''),
+                        'name': elem.get('name', ''),
+                        'required': 'required' in elem.attrib,
+                        'class': _class_string(css_class),
+                        'disabled': 'disabled' in elem.attrib,
+                        'multiple': 'multiple' in elem.attrib,
+                        'options': [],
+                        'attributes': {k: v for k, v in elem.attrib.items() 
+                                      if k not in SELECT_SKIP_ATTRS}
+                    }
+                    selects.append(select_info)
+                    select_stack.append((elem, select_info['options']))
+            
+                elif tag == 'option':
+                    for _, options in select_stack:
+                        option_info = {
+                            'value': elem.get('value', ''),
+                            'text': '',
+                            'selected': 'selected' in elem.attrib
+                        }
+                        options.append(option_info)
+                        targets.append((option_info, 'text'))
+            
+                elif tag == 'form':
+                    form_info = {
+                        'element_type': 'form',
+                        'id': elem.get('id', ''),
+                        'name': elem.get('name', ''),
+                        'action': elem.get('action', ''),
+                        'method': _intern(elem.get('method', 'get')),
+                        'class': _class_string(css_class),
+                        'inputs': [],
+                        'submission_elements': [],
+                        'attributes': {k: v for k, v in elem.attrib.items() 
+                                      if k not in FORM_SKIP_ATTRS}
+                    }
+                    forms.append(form_info)
+                    form_stack.append((elem, form_info))
+            
+                elif tag in HEADER_TAGS:
+                    header_info = {'level': _intern(tag), 'text': '', 'id': elem.get('id', '')}
+                    headers[tag].append(header_info)
+                    targets.append((header_info, 'text'))
+            
+                elif tag in ('div', 'section'):
+                    # Most divs carry neither attribute; test the class already in
+                    # hand before reading the id, and without splitting the class
+                    if (css_class and not css_class.isspace()) or elem.get('id'):
+                        add_section({
+                            'id': elem.get('id', ''),
+                            'class': _class_string(css_class)
+                        })
+            
+                elif tag == 'title':
+                    # Only the document title; SVG graphics may carry titles of their own
+                    if 'title' not in page_info:
+                        page_info['title'] = ''
+                        targets.append((page_info, 'title'))
+            
+                elif tag == 'script':
+                    if elem.get('src'):
+                        page_info['external_scripts'] += 1
+            
+                elif tag == 'nav' or (tag == 'ul' and 'nav' in lowered_class):
+                    nav_info = {
+                        'id': elem.get('id', ''),
+                        'class': _class_string(css_class),
+                        'items': []
+                    }
+                    navigation.append(nav_info)
+                    nav_stack.append((elem, nav_info))
+            
+            # Elements with button-like class names. Two substring checks on the
+            # already lowercased class beat a compiled regex search severalfold.
+            if lowered_class and tag not in ('button', 'input'):
+                if 'btn' in lowered_class or 'button' in lowered_class:
+                    button_info = {
+                        'element_type': 'button_class',
+                        'text': '',
+                        'html_tag': _intern(tag),
+                        'id': elem.get('id', ''),
+                        'class': _class_string(css_class),
+                        'attributes': {k: v for k, v in elem.attrib.items() if k not in CLASS_BUTTON_SKIP_ATTRS}
+                    }
+                    add_class_button(button_info)
+                    targets.append((button_info, 'text'))
+            
+            if targets:
+                add_pending((elem, targets))
         
-        return forms
-    
-    def _get_page_structure(self, soup):
-        """Extract basic page structure information."""
-        structure = {
-            'headers': [],
-            'sections': [],
-            'navigation': []
+        elements = {
+            'buttons': buttons + input_buttons + class_buttons,
+            'links': links,
+            'inputs': inputs + textareas + selects,
+            'forms': forms
         }
-        
-        # Extract headers
-        for header_tag in ['h1', 'h2', 'h3']:
-            for header in soup.find_all(header_tag):
-                structure['headers'].append({
-                    'level': header_tag,
-                    'text': header.text.strip(),
-                    'id': header.get('id', '')
-                })
-        
-        # Extract sections
-        for section in soup.find_all(['div', 'section']):
-            if section.get('id') or section.get('class'):
-                structure['sections'].append({
-                    'id': section.get('id', ''),
-                    'class': ' '.join(section.get('class', []))
-                })
-        
-        # Extract navigation
-        nav_elements = soup.find_all(['nav', 'ul'])
-        for nav in nav_elements:
-            if nav.name == 'nav' or ('class' in nav.attrs and any('nav' in c.lower() for c in nav.get('class', []))):
-                nav_items = []
-                for link in nav.find_all('a'):
-                    nav_items.append({
-                        'text': link.text.strip(),
-                        'href': link.get('href', '')
-                    })
-                if nav_items:
-                    structure['navigation'].append({
-                        'id': nav.get('id', ''),
-                        'class': ' '.join(nav.get('class', [])),
-                        'items': nav_items
-                    })
-        
-        return structure
+        page_structure = {
+            'headers': [header for tag in HEADER_TAGS for header in headers[tag]],
+            'sections': sections,
+            'navigation': [nav for nav in navigation if nav['items']]
+        }
+        return elements, page_structure, page_info
     
-    def save_elements(self, elements, output_path):
+    def save_elements(self, elements: Dict[str, Any], output_path: str) -> None:
         """
         Save the extracted elements to a JSON file.
         
@@ -323,5 +732,83 @@ class ElementExtractor:
             elements (dict): The extracted elements.
             output_path (str): Path to save the elements JSON file.
         """
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(elements, f, indent=2)
+        with ElementsWriter(output_path) as writer:
+            for name, value in elements.items():
+                if isinstance(value, list):
+                    writer.write_category(name, value)
+                else:
+                    writer.write_value(name, value)
+
+class ElementsWriter:
+    """
+    Context manager that writes an elements JSON object one entry at a time.
+    
+    Each record is encoded and written on its own, so the whole document never
+    exists as a single serialized buffer. The output matches orjson.dumps of
+    the complete dict with OPT_INDENT_2.
+    """
+    
+    OPTIONS: ClassVar[int] = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    
+    # Records are small, so buffer them into large writes rather than one
+    # syscall per few kilobytes
+    BUFFER_SIZE: ClassVar[int] = 1 << 20
+    
+    def __init__(self, output_path: str) -> None:
+        """
+        Initialize the ElementsWriter.
+        
+        Args:
+            output_path (str): Path of the JSON file to write.
+        """
+        self.output_path = output_path
+        self._file: Any = None
+        self._entries = 0
+    
+    def __enter__(self) -> 'ElementsWriter':
+        self._file = open(self.output_path, 'wb', buffering=self.BUFFER_SIZE)
+        self._file.write(b'{')
+        return self
+    
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        self._file.write(b'\n}' if self._entries else b'}')
+        self._file.close()
+        self._file = None
+    
+    def _write_key(self, name: str) -> None:
+        """Write the separator and key that start a top-level entry."""
+        if self._entries:
+            self._file.write(b',')
+        self._file.write(b'\n  ' + orjson.dumps(str(name)) + b': ')
+        self._entries += 1
+    
+    def _encode(self, value: Any, depth: int) -> bytes:
+        """Encode a value indented to sit at the given nesting depth."""
+        return orjson.dumps(value, option=self.OPTIONS).replace(b'\n', b'\n' + b'  ' * depth)
+    
+    def write_category(self, name: str, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Write a top-level list entry, encoding one record at a time.
+        
+        Args:
+            name (str): The category name, e.g. 'buttons'.
+            records (iterable): The category's element dicts.
+        """
+        self._write_key(name)
+        count = 0
+        for record in records:
+            self._file.write(b'[\n    ' if count == 0 else b',\n    ')
+            self._file.write(self._encode(record, 2))
+            count += 1
+        self._file.write(b'\n  ]' if count else b'[]')
+    
+    def write_value(self, name: str, value: Any) -> None:
+        """
+        Write a top-level entry holding any other JSON value.
+        
+        Args:
+            name (str): The entry name, e.g. 'metadata'.
+            value: The value to encode.
+        """
+        self._write_key(name)
+        self._file.write(self._encode(value, 1))
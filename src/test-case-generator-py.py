@@ -4,10 +4,31 @@ Test Case Generator module for generating test cases using GenAI.
 This module handles Task 2 of the project: generating test cases based on extracted UI elements.
 """
 
-import json
 import os
-import pandas as pd
-from src.utils import load_template, get_user_input
+import re
+import orjson
+from src.utils import load_template, get_user_input, save_rows_to_excel
+
+try:
+    # Streaming JSON parser for element files too large to load in one go
+    import ijson
+except ImportError:
+    ijson = None
+
+# Line classifier for AI responses; test case headers are case-sensitive, section headers are not
+_LINE_RE = re.compile(
+    r'(?P<test_case>(?:Test Case|TC-)[^:]*:)'
+    r'|(?P<steps>(?i:steps to execute|steps$))'
+    r'|(?P<expected>(?i:expected result|expected$))'
+)
+# Numbered step: starts with an ASCII digit; everything before the first '. ' is the step number
+_STEP_RE = re.compile(r'([0-9].*?)\. \s*(.*)')
+
+# Element files at least this large are streamed section by section when ijson is available
+STREAM_ELEMENTS_MIN_BYTES = 32 * 1024 * 1024
+
+# Column order of the test cases Excel file
+TEST_CASE_COLUMNS = ['Test Case ID', 'Test Scenario', 'Steps to Execute', 'Expected Result']
 
 class TestCaseGenerator:
     """Class responsible for generating test cases using AI."""
@@ -32,16 +53,69 @@ class TestCaseGenerator:
             
         Raises:
             FileNotFoundError: If the elements JSON file does not exist
-            json.JSONDecodeError: If the file contains invalid JSON
+            ValueError: If the file contains invalid JSON
         """
+        # Any cached prompt summary belongs to the previously loaded elements
+        self._formatted_cache = None
+        
         try:
-            with open(self.elements_json_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            # Large files keep only their metadata in memory; the element sections
+            # are streamed from disk while the prompt is formatted
+            self._streamed = ijson is not None and os.path.getsize(self.elements_json_path) >= STREAM_ELEMENTS_MIN_BYTES
+            if self._streamed:
+                return {'metadata': self._stream_metadata()}
+            
+            # orjson decodes the raw UTF-8 bytes directly, skipping the text layer
+            with open(self.elements_json_path, 'rb') as f:
+                return orjson.loads(f.read())
         except FileNotFoundError:
             raise FileNotFoundError(f"Elements file not found at: {self.elements_json_path}")
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             raise ValueError(f"Invalid JSON format in file: {self.elements_json_path}")
     
+    def _stream_metadata(self):
+        """
+        Read only the metadata object of the elements file.
+        
+        Returns:
+            dict: The page metadata, or an empty dict if the file has none
+        """
+        with open(self.elements_json_path, 'rb') as f:
+            try:
+                return next(ijson.items(f, 'metadata', use_float=True), {})
+            except ijson.JSONError:
+                raise ValueError(f"Invalid JSON format in file: {self.elements_json_path}")
+    
+    def _section_items(self, section):
+        """
+        Get the elements of one section of the elements file.
+        
+        Args:
+            section (str): The section name, e.g. 'buttons' or 'links'
+            
+        Returns:
+            iterable: The section's elements, streamed from disk for large files
+        """
+        if self._streamed:
+            return self._stream_section(section)
+        return self.elements.get(section) or ()
+    
+    def _stream_section(self, section):
+        """
+        Yield the elements of one section straight from the elements file.
+        
+        Args:
+            section (str): The section name, e.g. 'buttons' or 'links'
+            
+        Yields:
+            dict: One element at a time
+        """
+        with open(self.elements_json_path, 'rb') as f:
+            try:
+                yield from ijson.items(f, f'{section}.item', use_float=True)
+            except ijson.JSONError:
+                raise ValueError(f"Invalid JSON format in file: {self.elements_json_path}")
+    
     def generate_test_cases(self):
         """
         Generate test cases based on the extracted elements.
@@ -111,105 +185,112 @@ class TestCaseGenerator:
         Returns:
             str: Formatted elements summary for the prompt
         """
+        # The elements are not modified after loading, so the summary is built once
+        if self._formatted_cache is not None:
+            return self._formatted_cache
+        
         formatted_elements = []
+        append = formatted_elements.append
+        elements = self.elements
         
         # Add site metadata if available
-        if 'metadata' in self.elements and 'description' in self.elements['metadata']:
-            formatted_elements.append(f"SITE DESCRIPTION: {self.elements['metadata']['description']}\n")
+        metadata = elements.get('metadata') or {}
+        if 'description' in metadata:
+            append(f"SITE DESCRIPTION: {metadata['description']}\n")
         
         # Format buttons
-        if 'buttons' in self.elements and self.elements['buttons']:
-            formatted_elements.append("BUTTONS:")
-            for idx, button in enumerate(self.elements['buttons'], 1):
-                text = button.get('text', '[No text]')
-                element_type = button.get('element_type', 'button')
-                element_id = button.get('id', '[No ID]')
-                css_class = button.get('class', '[No class]')
-                formatted_elements.append(f"  {idx}. {text} ({element_type}, id={element_id}, class={css_class})")
+        for idx, button in enumerate(self._section_items('buttons'), 1):
+            if idx == 1:
+                append("BUTTONS:")
+            text = button.get('text', '[No text]')
+            element_type = button.get('element_type', 'button')
+            element_id = button.get('id', '[No ID]')
+            css_class = button.get('class', '[No class]')
+            append(f"  {idx}. {text} ({element_type}, id={element_id}, class={css_class})")
         
         # Format links
-        if 'links' in self.elements and self.elements['links']:
-            formatted_elements.append("\nLINKS:")
-            for idx, link in enumerate(self.elements['links'], 1):
-                text = link.get('text', '[No text]')
-                href = link.get('href', '[No href]')
-                target = link.get('target', '_self')
-                formatted_elements.append(f"  {idx}. {text} (href={href}, target={target})")
+        for idx, link in enumerate(self._section_items('links'), 1):
+            if idx == 1:
+                append("\nLINKS:")
+            text = link.get('text', '[No text]')
+            href = link.get('href', '[No href]')
+            target = link.get('target', '_self')
+            append(f"  {idx}. {text} (href={href}, target={target})")
         
         # Format input fields
-        if 'inputs' in self.elements and self.elements['inputs']:
-            formatted_elements.append("\nINPUT FIELDS:")
-            for idx, input_field in enumerate(self.elements['inputs'], 1):
-                input_type = input_field.get('element_type', 'input')
-                
-                if input_type == 'input':
-                    field_type = input_field.get('type', 'text')
-                    name = input_field.get('name', '[No name]')
-                    placeholder = input_field.get('placeholder', '[No placeholder]')
-                    required = 'required' if input_field.get('required', False) else 'optional'
-                    formatted_elements.append(f"  {idx}. {field_type} input (name={name}, placeholder={placeholder}, {required})")
-                
-                elif input_type == 'textarea':
-                    name = input_field.get('name', '[No name]')
-                    placeholder = input_field.get('placeholder', '[No placeholder]')
-                    rows = input_field.get('rows', 'default')
-                    formatted_elements.append(f"  {idx}. textarea (name={name}, placeholder={placeholder}, rows={rows})")
-                
-                elif input_type == 'select':
-                    name = input_field.get('name', '[No name]')
-                    options = input_field.get('options', [])
-                    options_count = len(options)
-                    options_text = ", ".join([opt.get('text', 'Option') for opt in options[:5]])
-                    if options_count > 5:
-                        options_text += f", ... ({options_count-5} more)"
-                    formatted_elements.append(f"  {idx}. select dropdown (name={name}, options: {options_text})")
+        for idx, input_field in enumerate(self._section_items('inputs'), 1):
+            if idx == 1:
+                append("\nINPUT FIELDS:")
+            input_type = input_field.get('element_type', 'input')
+            
+            if input_type == 'input':
+                field_type = input_field.get('type', 'text')
+                name = input_field.get('name', '[No name]')
+                placeholder = input_field.get('placeholder', '[No placeholder]')
+                required = 'required' if input_field.get('required', False) else 'optional'
+                append(f"  {idx}. {field_type} input (name={name}, placeholder={placeholder}, {required})")
+            
+            elif input_type == 'textarea':
+                name = input_field.get('name', '[No name]')
+                placeholder = input_field.get('placeholder', '[No placeholder]')
+                rows = input_field.get('rows', 'default')
+                append(f"  {idx}. textarea (name={name}, placeholder={placeholder}, rows={rows})")
+            
+            elif input_type == 'select':
+                name = input_field.get('name', '[No name]')
+                options = input_field.get('options') or ()
+                options_count = len(options)
+                options_text = ", ".join([opt.get('text', 'Option') for opt in options[:5]])
+                if options_count > 5:
+                    options_text += f", ... ({options_count-5} more)"
+                append(f"  {idx}. select dropdown (name={name}, options: {options_text})")
         
         # Format forms
-        if 'forms' in self.elements and self.elements['forms']:
-            formatted_elements.append("\nFORMS:")
-            for idx, form in enumerate(self.elements['forms'], 1):
-                form_id = form.get('id', '[No ID]')
-                method = form.get('method', 'get')
-                action = form.get('action', '[No action]')
-                inputs_count = len(form.get('inputs', []))
-                formatted_elements.append(f"  {idx}. form (id={form_id}, method={method}, action={action}, {inputs_count} inputs)")
-                
-                # Add details about form inputs
-                if form.get('inputs'):
-                    for i, input_field in enumerate(form['inputs'], 1):
-                        input_type = input_field.get('element_type', 'input')
-                        field_type = input_field.get('type', 'text') if input_type == 'input' else input_type
-                        name = input_field.get('name', '[No name]')
-                        formatted_elements.append(f"    {i}. {field_type} (name={name})")
+        for idx, form in enumerate(self._section_items('forms'), 1):
+            if idx == 1:
+                append("\nFORMS:")
+            form_id = form.get('id', '[No ID]')
+            method = form.get('method', 'get')
+            action = form.get('action', '[No action]')
+            form_inputs = form.get('inputs') or ()
+            inputs_count = len(form_inputs)
+            append(f"  {idx}. form (id={form_id}, method={method}, action={action}, {inputs_count} inputs)")
+            
+            # Add details about form inputs
+            for i, input_field in enumerate(form_inputs, 1):
+                input_type = input_field.get('element_type', 'input')
+                field_type = input_field.get('type', 'text') if input_type == 'input' else input_type
+                name = input_field.get('name', '[No name]')
+                append(f"    {i}. {field_type} (name={name})")
         
         # Add page structure info
-        if 'metadata' in self.elements and 'page_structure' in self.elements['metadata']:
-            page_structure = self.elements['metadata']['page_structure']
-            
-            if 'headers' in page_structure and page_structure['headers']:
-                formatted_elements.append("\nPAGE HEADERS:")
-                for header in page_structure['headers']:
-                    level = header.get('level', 'h')
-                    text = header.get('text', '[No text]')
-                    formatted_elements.append(f"  - {level}: {text}")
+        page_structure = metadata.get('page_structure') or {}
+        
+        for idx, header in enumerate(page_structure.get('headers') or (), 1):
+            if idx == 1:
+                append("\nPAGE HEADERS:")
+            level = header.get('level', 'h')
+            text = header.get('text', '[No text]')
+            append(f"  - {level}: {text}")
+        
+        for idx, nav in enumerate(page_structure.get('navigation') or (), 1):
+            if idx == 1:
+                append("\nNAVIGATION MENUS:")
+            nav_id = nav.get('id', '[No ID]')
+            items = nav.get('items') or ()
+            items_count = len(items)
+            append(f"  - Navigation (id={nav_id}, {items_count} items)")
             
-            if 'navigation' in page_structure and page_structure['navigation']:
-                formatted_elements.append("\nNAVIGATION MENUS:")
-                for nav in page_structure['navigation']:
-                    nav_id = nav.get('id', '[No ID]')
-                    items = nav.get('items', [])
-                    items_count = len(items)
-                    formatted_elements.append(f"  - Navigation (id={nav_id}, {items_count} items)")
-                    
-                    # Add details about nav items
-                    for i, item in enumerate(items[:5], 1):
-                        text = item.get('text', '[No text]')
-                        href = item.get('href', '[No href]')
-                        formatted_elements.append(f"    {i}. {text} (href={href})")
-                    if items_count > 5:
-                        formatted_elements.append(f"    ... ({items_count-5} more items)")
-        
-        return "\n".join(formatted_elements)
+            # Add details about nav items
+            for i, item in enumerate(items[:5], 1):
+                text = item.get('text', '[No text]')
+                href = item.get('href', '[No href]')
+                append(f"    {i}. {text} (href={href})")
+            if items_count > 5:
+                append(f"    ... ({items_count-5} more items)")
+        
+        self._formatted_cache = "\n".join(formatted_elements)
+        return self._formatted_cache
     
     def _process_ai_response(self, response):
         """
@@ -225,8 +306,8 @@ class TestCaseGenerator:
             print("Warning: Empty AI response received.")
             return []
             
-        # Split response into lines
-        lines = response.strip().split('\n')
+        # Split response into lines; blank lines are skipped below, so no strip() copy is needed
+        lines = response.splitlines()
         
         current_test_case = None
         section = None
@@ -236,61 +317,71 @@ class TestCaseGenerator:
             if not line:
                 continue
                 
+            match = _LINE_RE.match(line)
+            kind = match.lastgroup if match else None
+            
             # Look for test case headers (Test Case ID markers)
-            if (line.startswith('Test Case') and ':' in line) or (line.startswith('TC-') and ':' in line):
+            if kind == 'test_case':
                 # Save previous test case if it exists
                 if current_test_case:
-                    self.test_cases.append(current_test_case)
+                    self.test_cases.append(self._join_fragments(current_test_case))
                 
                 # Start a new test case
                 parts = line.split(':', 1)
                 test_id = parts[0].strip()
                 test_scenario = parts[1].strip() if len(parts) > 1 else ""
+                # Text is collected as fragments and joined once the test case is complete
                 current_test_case = {
                     'Test Case ID': test_id,
                     'Test Scenario': test_scenario,
-                    'Steps to Execute': [],
-                    'Expected Result': ''
+                    'Steps to Execute': [],  # One list of fragments per step
+                    'Expected Result': []
                 }
                 section = None
             
             # Look for section headers
-            elif line.lower().startswith('steps to execute') or line.lower() == 'steps':
+            elif kind == 'steps':
                 section = 'Steps to Execute'
-            elif line.lower().startswith('expected result') or line.lower() == 'expected':
+            elif kind == 'expected':
                 section = 'Expected Result'
                 
             # Add content to current section
             elif section and current_test_case:
                 if section == 'Steps to Execute':
                     # Check if this is a numbered step
-                    if line[0].isdigit() and '. ' in line:
-                        step_number = line.split('. ')[0]
-                        step_text = line[len(step_number) + 2:].strip()
-                        current_test_case[section].append(step_text)
+                    step = _STEP_RE.match(line)
+                    if step:
+                        current_test_case[section].append([step.group(2)])
+                    elif current_test_case[section]:
+                        # Continuation of previous step
+                        current_test_case[section][-1].append(line)
                     else:
-                        # Continuation of previous step or unnumbered step
-                        if current_test_case[section]:
-                            # Check if it's just a continuation
-                            if not line[0].isdigit() or '. ' not in line:
-                                current_test_case[section][-1] += " " + line
-                            else:
-                                # It's a new step without proper numbering
-                                current_test_case[section].append(line)
-                        else:
-                            current_test_case[section].append(line)
+                        # Unnumbered first step
+                        current_test_case[section].append([line])
                 else:  # Expected Result section
-                    if current_test_case[section]:
-                        current_test_case[section] += " " + line
-                    else:
-                        current_test_case[section] = line
+                    current_test_case[section].append(line)
         
         # Don't forget to add the last test case
         if current_test_case:
-            self.test_cases.append(current_test_case)
+            self.test_cases.append(self._join_fragments(current_test_case))
             
         return self.test_cases
     
+    def _join_fragments(self, test_case):
+        """
+        Join the text fragments collected for a test case into its final fields.
+        
+        Args:
+            test_case (dict): A test case whose steps and expected result are
+                still lists of line fragments
+            
+        Returns:
+            dict: The same test case with each step and the expected result as a string
+        """
+        test_case['Steps to Execute'] = [" ".join(step) for step in test_case['Steps to Execute']]
+        test_case['Expected Result'] = " ".join(test_case['Expected Result'])
+        return test_case
+    
     def save_test_cases(self, output_path):
         """
         Save the generated test cases to an Excel file.
@@ -309,29 +400,57 @@ class TestCaseGenerator:
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
             
-            # Convert the steps list to a string for Excel
-            processed_test_cases = []
-            for test_case in self.test_cases:
-                processed_case = test_case.copy()
-                
-                if isinstance(processed_case['Steps to Execute'], list):
-                    # Convert list of steps to numbered steps
-                    steps_text = ""
-                    for i, step in enumerate(processed_case['Steps to Execute'], 1):
-                        steps_text += f"{i}. {step}\n"
-                    processed_case['Steps to Execute'] = steps_text.strip()
-                    
-                processed_test_cases.append(processed_case)
-            
-            # Create DataFrame and save to Excel
-            df = pd.DataFrame(processed_test_cases)
-            df.to_excel(output_path, index=False)
+            # Stream one row per test case straight into the workbook
+            save_rows_to_excel(output_path, TEST_CASE_COLUMNS, self._test_case_rows())
             print(f"\nTest cases successfully saved to: {output_path}")
             return True
             
         except Exception as e:
             print(f"Error saving test cases to Excel: {str(e)}")
             return False
+    
+    def save_test_cases_jsonl(self, output_path):
+        """
+        Save the generated test cases as JSON Lines, one test case per line.
+        The records match the Excel rows, so the script generator can read them
+        back without the xlsx round trip.
+        
+        Args:
+            output_path (str): Path to save the test cases JSONL file.
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self.test_cases:
+            print("Error: No test cases to save.")
+            return False
+            
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            
+            with open(output_path, 'wb') as f:
+                f.writelines(orjson.dumps(dict(zip(TEST_CASE_COLUMNS, row))) + b'\n' for row in self._test_case_rows())
+            return True
+            
+        except Exception as e:
+            print(f"Error saving test cases to JSONL: {str(e)}")
+            return False
+    
+    def _test_case_rows(self):
+        """
+        Yield the test cases as Excel rows, with the steps list as numbered text.
+        
+        Yields:
+            list: The cell values of one test case, in TEST_CASE_COLUMNS order
+        """
+        for test_case in self.test_cases:
+            steps = test_case['Steps to Execute']
+            
+            if isinstance(steps, list):
+                # Convert list of steps to numbered steps
+                steps = "\n".join([f"{i}. {step}" for i, step in enumerate(steps, 1)]).strip()
+            
+            yield [test_case['Test Case ID'], test_case['Test Scenario'], steps, test_case['Expected Result']]
             
     def get_test_cases(self):
         """
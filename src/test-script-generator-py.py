@@ -4,8 +4,35 @@ Test Script Generator module for creating Selenium test scripts.
 This module handles Task 3 of the project: generating Selenium scripts for test cases.
 """
 
+import asyncio
+import os
+import re
+import orjson
 import pandas as pd
-from src.utils import load_template, get_user_input
+from src.utils import load_template, get_user_input, save_rows_to_excel
+
+try:
+    # Native (Rust) xlsx reader; pandas' openpyxl engine is used when it is not installed
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+# Column order of the test scripts Excel file; the code itself is saved as one .py file per test case
+TEST_SCRIPT_COLUMNS = ['Test Case ID', 'Test Scenario', 'Script File']
+# Directory, next to the scripts Excel file, that holds the generated .py files
+SCRIPTS_DIR_NAME = 'scripts'
+# Upper bound on concurrent AI requests in generate_scripts_async, to stay within provider rate limits
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+# Characters replaced when a test case ID is turned into a file name
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w.-]+')
+
+# Body of a ```python block; a block ends at a closing ``` line, the next ```python line or the end
+_CODE_BLOCK_RE = re.compile(
+    r'^[^\S\n]*```python[^\n]*(?:\n|\Z)(.*?)(?:^[^\S\n]*```[^\S\n]*$|(?=^[^\S\n]*```python)|\Z)',
+    re.MULTILINE | re.DOTALL
+)
+# First line that starts a Python import
+_IMPORT_RE = re.compile(r'^[^\S\n]*(?:import |from )', re.MULTILINE)
 
 class TestScriptGenerator:
     """Class responsible for generating Selenium test scripts using AI."""
@@ -22,8 +49,34 @@ class TestScriptGenerator:
         self.test_scripts = []
         
     def _load_test_cases(self):
-        """Load test cases from the Excel file."""
-        return pd.read_excel(self.test_cases_path).to_dict('records')
+        """Load test cases from the Excel file, or from a JSONL file written by the test case generator."""
+        if self.test_cases_path.endswith('.jsonl'):
+            return self._load_test_cases_jsonl()
+        
+        if CalamineWorkbook is None:
+            return pd.read_excel(self.test_cases_path).to_dict('records')
+        
+        # Map the header row onto each non-blank row, as read_excel does
+        rows = CalamineWorkbook.from_path(self.test_cases_path).get_sheet_by_index(0).to_python()
+        if not rows:
+            return []
+        headers = rows[0]
+        return [dict(zip(headers, row)) for row in rows[1:] if any(cell != '' for cell in row)]
+    
+    def _load_test_cases_jsonl(self):
+        """
+        Load test cases from a JSON Lines file, one test case per line.
+        
+        Raises:
+            ValueError: If a line is not valid JSON
+        """
+        with open(self.test_cases_path, 'rb') as f:
+            lines = f.read().splitlines()
+        
+        try:
+            return [orjson.loads(line) for line in lines if line.strip()]
+        except orjson.JSONDecodeError:
+            raise ValueError(f"Invalid JSON format in file: {self.test_cases_path}")
     
     def generate_scripts(self):
         """
@@ -35,6 +88,8 @@ class TestScriptGenerator:
         """
         # Load the prompt template
         prompt_template = load_template('ai_prompts/test_script_prompt_template.txt')
+        render_prompt = prompt_template.format_map
+        total = len(self.test_cases)
         
         print("\n" + "="*80)
         print("STEP 2: GENERATING SELENIUM SCRIPTS")
@@ -43,18 +98,11 @@ class TestScriptGenerator:
         for i, test_case in enumerate(self.test_cases, 1):
             test_id = test_case['Test Case ID']
             test_scenario = test_case['Test Scenario']
-            steps = test_case['Steps to Execute']
-            expected_result = test_case['Expected Result']
             
             # Prepare the full prompt
-            prompt = prompt_template.format(
-                test_id=test_id,
-                test_scenario=test_scenario,
-                steps=steps,
-                expected_result=expected_result
-            )
+            prompt = self._build_prompt(render_prompt, test_case)
             
-            print(f"\nGenerating script for {test_id}: {test_scenario} ({i}/{len(self.test_cases)})")
+            print(f"\nGenerating script for {test_id}: {test_scenario} ({i}/{total})")
             print("\n" + "-"*40 + " PROMPT START " + "-"*40)
             print(prompt)
             print("-"*40 + " PROMPT END " + "-"*41 + "\n")
@@ -62,63 +110,137 @@ class TestScriptGenerator:
             # Get AI response (via manual input)
             ai_response = get_user_input(f"Paste the AI's response for {test_id} (press Enter twice to finish):\n")
             
-            # Extract the code from the AI response
-            script_code = self._extract_code_from_response(ai_response)
-            
-            # Store the generated script
-            self.test_scripts.append({
-                'Test Case ID': test_id,
-                'Test Scenario': test_scenario,
-                'Python Selenium Code': script_code
-            })
+            # Extract the code from the AI response and store the generated script
+            self.test_scripts.append(self._build_script(test_case, ai_response))
             
             print(f"Script for {test_id} generated successfully.")
         
         print(f"\nAll {len(self.test_scripts)} scripts generated successfully.")
     
+    async def generate_scripts_async(self, complete, max_concurrency=DEFAULT_MAX_CONCURRENT_REQUESTS):
+        """
+        Generate Selenium scripts for all test cases concurrently through an AI API.
+        The manual flow stays in generate_scripts; this is for API-backed providers,
+        where each test case is an independent request.
+        
+        Args:
+            complete (callable): Async function that sends a prompt to the AI
+                provider and returns the response text.
+            max_concurrency (int): Maximum number of requests in flight at once.
+        """
+        prompt_template = load_template('ai_prompts/test_script_prompt_template.txt')
+        render_prompt = prompt_template.format_map
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def generate_one(test_case):
+            prompt = self._build_prompt(render_prompt, test_case)
+            async with semaphore:
+                ai_response = await complete(prompt)
+            return self._build_script(test_case, ai_response)
+        
+        # gather keeps the results in test case order
+        scripts = await asyncio.gather(*(generate_one(test_case) for test_case in self.test_cases))
+        self.test_scripts.extend(scripts)
+        
+        print(f"\nAll {len(self.test_scripts)} scripts generated successfully.")
+    
+    def _build_prompt(self, render_prompt, test_case):
+        """
+        Fill in the script prompt template for one test case.
+        
+        Args:
+            render_prompt (callable): The template's bound format_map.
+            test_case (dict): The test case to generate a script for.
+            
+        Returns:
+            str: The full prompt
+        """
+        return render_prompt({
+            'test_id': test_case['Test Case ID'],
+            'test_scenario': test_case['Test Scenario'],
+            'steps': test_case['Steps to Execute'],
+            'expected_result': test_case['Expected Result']
+        })
+    
+    def _build_script(self, test_case, ai_response):
+        """
+        Build the stored script record from an AI response.
+        
+        Args:
+            test_case (dict): The test case the script was generated for.
+            ai_response (str): The AI's response text.
+            
+        Returns:
+            dict: The script record, as stored in test_scripts
+        """
+        return {
+            'Test Case ID': test_case['Test Case ID'],
+            'Test Scenario': test_case['Test Scenario'],
+            'Python Selenium Code': self._extract_code_from_response(ai_response)
+        }
+    
     def _extract_code_from_response(self, response):
         """
         Extract the Python code from the AI response.
         Assumes the code is enclosed in markdown code blocks (```python ... ```).
         """
-        lines = response.strip().split('\n')
-        code_lines = []
-        in_code_block = False
-        
-        for line in lines:
-            if line.strip().startswith("```python") or line.strip() == "```python":
-                in_code_block = True
-                continue
-            elif line.strip() == "```" and in_code_block:
-                in_code_block = False
-                continue
-            
-            if in_code_block:
-                code_lines.append(line)
-            
-        # If no code blocks found, try to extract raw Python code
-        if not code_lines:
-            # Look for import statements as markers of Python code
-            in_code = False
-            for line in lines:
-                if line.strip().startswith("import ") or line.strip().startswith("from "):
-                    in_code = True
-                
-                if in_code:
-                    code_lines.append(line)
+        response = response.strip()
+        
+        # Join the bodies of all code blocks, dropping the newline before each closing fence
+        code_blocks = []
+        for match in _CODE_BLOCK_RE.finditer(response):
+            block = match.group(1)
+            if block:
+                code_blocks.append(block[:-1] if block.endswith('\n') else block)
+        
+        if code_blocks:
+            return "\n".join(code_blocks)
+        
+        # If no code blocks found, look for import statements as markers of Python code
+        match = _IMPORT_RE.search(response)
+        if match:
+            return response[match.start():]
         
         # If still no code found, assume the entire response is code
-        if not code_lines:
-            code_lines = lines
-            
-        return "\n".join(code_lines)
+        return response
     
     def save_scripts(self, output_path):
         """
         Save the generated scripts to an Excel file.
+        Each script is written to its own .py file in a scripts directory next to
+        the Excel file, and the sheet links to it by relative path.
         
         Args:
             output_path (str): Path to save the scripts Excel file.
         """
-        df = pd.DataFrame(self.test_scripts)
-        df.to_excel(output_path, index=False)
+        scripts_dir = os.path.join(os.path.dirname(os.path.abspath(output_path)), SCRIPTS_DIR_NAME)
+        os.makedirs(scripts_dir, exist_ok=True)
+        save_rows_to_excel(output_path, TEST_SCRIPT_COLUMNS, self._script_rows(scripts_dir))
+    
+    def _script_rows(self, scripts_dir):
+        """
+        Write each script to its .py file and yield the matching Excel rows.
+        
+        Args:
+            scripts_dir (str): Directory to write the script files to.
+            
+        Yields:
+            list: The cell values of one script, in TEST_SCRIPT_COLUMNS order
+        """
+        used_names = set()
+        for script in self.test_scripts:
+            test_id = script['Test Case ID']
+            
+            # Build a file name from the test case ID, numbering duplicates
+            base_name = _UNSAFE_FILENAME_RE.sub('_', str(test_id)).strip('._') or 'test_case'
+            file_name = f"{base_name}.py"
+            suffix = 2
+            while file_name.lower() in used_names:
+                file_name = f"{base_name}_{suffix}.py"
+                suffix += 1
+            used_names.add(file_name.lower())
+            
+            with open(os.path.join(scripts_dir, file_name), 'w', encoding='utf-8') as f:
+                f.write(script['Python Selenium Code'])
+            
+            yield [test_id, script['Test Scenario'], f"{SCRIPTS_DIR_NAME}/{file_name}"]
@@ -6,7 +6,15 @@ Utility functions for the AI-driven test automation project.
 import os
 import sys
 import re
+from functools import lru_cache
 from urllib.parse import urlparse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+# Template locations, resolved once relative to the project root
+_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+_AI_PROMPTS_DIR = os.path.join(_TEMPLATES_DIR, 'ai_prompts')
 
 def setup_directories(output_dir):
     """
@@ -16,25 +24,22 @@ def setup_directories(output_dir):
         output_dir (str): The output directory path.
     """
     # Create output directory if it doesn't exist
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
     
     # Create templates directory if it doesn't exist
-    templates_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
-    if not os.path.exists(templates_dir):
-        os.makedirs(templates_dir)
-        os.makedirs(os.path.join(templates_dir, 'ai_prompts'))
-        os.makedirs(os.path.join(templates_dir, 'export_templates'))
+    if not os.path.isdir(_TEMPLATES_DIR):
+        os.makedirs(_AI_PROMPTS_DIR, exist_ok=True)
+        os.makedirs(os.path.join(_TEMPLATES_DIR, 'export_templates'), exist_ok=True)
         
         # Create default prompt templates
         create_default_templates()
 
 def create_default_templates():
     """Create default template files if they don't exist."""
-    templates_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
+    os.makedirs(_AI_PROMPTS_DIR, exist_ok=True)
     
     # Create test case prompt template
-    test_case_prompt_path = os.path.join(templates_dir, 'ai_prompts', 'test_case_prompt_template.txt')
+    test_case_prompt_path = os.path.join(_AI_PROMPTS_DIR, 'test_case_prompt_template.txt')
     if not os.path.exists(test_case_prompt_path):
         with open(test_case_prompt_path, 'w', encoding='utf-8') as f:
             f.write("""I need to generate test cases for a website called "{site_name}" ({site_url}).
@@ -53,7 +58,7 @@ Format each test case clearly, making sure each one tests a specific functionali
 """)
     
     # Create test script prompt template
-    test_script_prompt_path = os.path.join(templates_dir, 'ai_prompts', 'test_script_prompt_template.txt')
+    test_script_prompt_path = os.path.join(_AI_PROMPTS_DIR, 'test_script_prompt_template.txt')
     if not os.path.exists(test_script_prompt_path):
         with open(test_script_prompt_path, 'w', encoding='utf-8') as f:
             f.write("""Please create a Python Selenium script for the following test case:
@@ -99,9 +104,11 @@ if __name__ == "__main__":
 ```
 """)
 
+@lru_cache(maxsize=32)
 def load_template(template_name):
     """
     Load a template file.
+    The content is cached per template name, so each file is read only once.
     
     Args:
         template_name (str): Name of the template file.
@@ -109,8 +116,7 @@ def load_template(template_name):
     Returns:
         str: The template content.
     """
-    templates_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
-    template_path = os.path.join(templates_dir, template_name)
+    template_path = os.path.join(_TEMPLATES_DIR, template_name)
     
     try:
         with open(template_path, 'r', encoding='utf-8') as f:
@@ -134,20 +140,70 @@ def get_user_input(prompt):
     Returns:
         str: The user's input.
     """
-    print(prompt)
+    print(prompt, flush=True)
     
+    # Read the buffered stdin stream directly instead of calling input() per line;
+    # anything after the terminating blank lines stays buffered for the next call
+    readline = sys.stdin.readline
     lines = []
+    previous_blank = False
     while True:
-        try:
-            line = input()
-            if not line.strip() and lines and not lines[-1].strip():
-                break
-            lines.append(line)
-        except EOFError:
+        line = readline()
+        if not line:  # EOF
+            break
+        line = line.rstrip('\n')
+        blank = not line.strip()
+        if blank and previous_blank:
             break
+        lines.append(line)
+        previous_blank = blank
     
     return "\n".join(lines)
 
+def parse_urls(value):
+    """
+    Parse the target URLs given on the command line.
+    
+    Args:
+        value (str): A comma-separated list of URLs, or the path of a file
+            containing one URL per line.
+        
+    Returns:
+        list: The URLs, in the order given.
+    """
+    if os.path.isfile(value):
+        with open(value, 'r', encoding='utf-8') as f:
+            urls = f.read().splitlines()
+    else:
+        urls = value.split(',')
+    
+    return [url.strip() for url in urls if url.strip()]
+
+def save_rows_to_excel(output_path, headers, rows):
+    """
+    Stream rows into an Excel sheet without building the workbook in memory.
+    
+    Args:
+        output_path (str): Path of the Excel file to write.
+        headers (list): Column headers, written as a bold first row.
+        rows (iterable): Rows of cell values, in the same order as the headers.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    
+    header_font = Font(bold=True)
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = header_font
+        header_cells.append(cell)
+    ws.append(header_cells)
+    
+    for row in rows:
+        ws.append(row)
+    
+    wb.save(output_path)
+
 def validate_url(url):
     """
     Validate if a string is a proper URL.